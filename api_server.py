@@ -0,0 +1,251 @@
+"""Read-only HTTP/JSON API over the project plans.
+
+Run alongside the Streamlit app:
+
+    python api_server.py --port 8502
+
+Serves the persisted projects, the unified plan (template + project tasks),
+KPIs, Gantt bars and the critical path. Responses are cached per data version
+and support ETag revalidation, gzip and pagination.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+
+from app import (
+    PAGE_SIZES, PROJECTS_DATA_FILE, TEMPLATE_FILE,
+    apply_filters, build_search_index, calculate_critical_path, calculate_project_kpis,
+    create_unified_dataframe, load_demo_data, load_projects, load_template,
+    page_tasks, search_tasks, task_status_color
+)
+
+DEFAULT_PORT = 8502
+MAX_PAGE_SIZE = 1000
+RESPONSE_CACHE_SIZE = 256
+GZIP_MIN_BYTES = 1024
+# The socketserver default backlog of 5 stalls accepts at moderate concurrency
+REQUEST_QUEUE_SIZE = 128
+# Only files that feed an endpoint; saving a baseline must not invalidate cached responses
+SOURCE_FILES = [TEMPLATE_FILE, PROJECTS_DATA_FILE]
+
+class TaskStore:
+    """Persisted plans, reloaded only when one of the source files changes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.responses = OrderedDict()
+
+    def source_version(self):
+        """Version of the data on disk, taken from the source files' modification times"""
+        return tuple(os.path.getmtime(path) if os.path.exists(path) else 0 for path in SOURCE_FILES)
+
+    def refresh(self):
+        """Reload plans and clear cached responses when the data on disk has changed"""
+        version = self.source_version()
+        if version == self.version:
+            return
+        with self.lock:
+            if version == self.version:
+                return
+            self.unified = create_unified_dataframe(load_template(), load_demo_data())
+            self.search_index = build_search_index(self.unified)
+            self.projects = load_projects()
+            self.critical_path = calculate_critical_path(self.unified)
+            self.etag_prefix = hashlib.sha1(repr(version).encode()).hexdigest()[:12]
+            self.responses.clear()
+            self.version = version
+
+    def cached_response(self, request_key, build):
+        """Return (etag, body, gzipped body) for a request, building and caching it on first use"""
+        key = (self.version, request_key)
+        with self.lock:
+            if key in self.responses:
+                self.responses.move_to_end(key)
+                return self.responses[key]
+
+        body = json.dumps(build(), default=json_default).encode('utf-8')
+        gzipped = gzip.compress(body, compresslevel=5) if len(body) >= GZIP_MIN_BYTES else None
+        etag = f'"{self.etag_prefix}-{hashlib.sha1(request_key.encode()).hexdigest()[:12]}"'
+        with self.lock:
+            self.responses[key] = (etag, body, gzipped)
+            while len(self.responses) > RESPONSE_CACHE_SIZE:
+                self.responses.popitem(last=False)
+        return etag, body, gzipped
+
+def json_default(value):
+    """Serialize numpy scalars and timestamps"""
+    if isinstance(value, (np.integer, np.floating)):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if value is pd.NaT:
+        return None
+    return str(value)
+
+def records(df: pd.DataFrame):
+    """Convert a dataframe to JSON-ready records with ISO dates"""
+    return json.loads(df.to_json(orient='records', date_format='iso'))
+
+def query_value(query, name, default=None):
+    """First value of a query string parameter"""
+    return query.get(name, [default])[0]
+
+def paginate(df: pd.DataFrame, query):
+    """Sort and page a dataframe according to the query string"""
+    try:
+        page = max(1, int(query_value(query, 'page', 1)))
+        page_size = min(MAX_PAGE_SIZE, max(1, int(query_value(query, 'page_size', PAGE_SIZES[1]))))
+    except ValueError:
+        raise ApiError(400, "page and page_size must be integers")
+
+    sort_by = query_value(query, 'sort')
+    ascending = query_value(query, 'order', 'asc') != 'desc'
+    page_df = page_tasks(df, sort_by, ascending, page - 1, page_size)
+    return {
+        'page': page,
+        'page_size': page_size,
+        'total': len(df),
+        'pages': max(1, int(np.ceil(len(df) / page_size))),
+        'items': records(page_df)
+    }
+
+def filtered_tasks(store: TaskStore, query) -> pd.DataFrame:
+    """Unified plan filtered by site, phase, status and search text"""
+    df = apply_filters(store.unified, query_value(query, 'site'), query_value(query, 'phase'),
+                       query_value(query, 'status'))
+    return search_tasks(df, store.search_index, (query_value(query, 'search') or '').strip())
+
+def gantt_bars(df: pd.DataFrame):
+    """Task bars with status colors, as drawn by generate_gantt"""
+    bars = df[df['Planned Start'].notna() & df['Planned Finish'].notna()]
+    return [
+        {
+            'task_id': task_id, 'task_name': task_name, 'start': start.isoformat(), 'finish': finish.isoformat(),
+            'status': status, 'phase': phase, 'owner': owner, 'color': task_status_color(status, finish)
+        }
+        for task_id, task_name, start, finish, status, phase, owner in zip(
+            bars['Task ID'], bars['Task Name'], bars['Planned Start'], bars['Planned Finish'],
+            bars['Status'], bars['Phase'], bars['Owner']
+        )
+    ]
+
+class ApiError(Exception):
+    """Error returned to the client with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def route(store: TaskStore, path: str, query):
+    """Build the response payload for a request path"""
+    parts = [unquote(part) for part in path.strip('/').split('/')]
+
+    if parts == ['api', 'projects']:
+        return [
+            {'name': name, 'tasks': len(df), 'owners': int(df['OWNER'].nunique()) if 'OWNER' in df.columns else 0}
+            for name, df in store.projects.items()
+        ]
+    if len(parts) == 4 and parts[:2] == ['api', 'projects'] and parts[3] == 'tasks':
+        if parts[2] not in store.projects:
+            raise ApiError(404, f"Project '{parts[2]}' not found")
+        return paginate(store.projects[parts[2]], query)
+    if parts == ['api', 'tasks']:
+        return paginate(filtered_tasks(store, query), query)
+    if parts == ['api', 'kpis']:
+        return calculate_project_kpis(filtered_tasks(store, query))
+    if parts == ['api', 'gantt']:
+        return gantt_bars(filtered_tasks(store, query))
+    if parts == ['api', 'critical-path']:
+        return store.critical_path
+    raise ApiError(404, f"Unknown endpoint '{path}'")
+
+class PlanApiServer(ThreadingHTTPServer):
+    """Threading server with a listen backlog large enough for concurrent clients"""
+    request_queue_size = REQUEST_QUEUE_SIZE
+    daemon_threads = True
+
+def make_handler(store: TaskStore):
+    """Request handler bound to a task store"""
+
+    class ApiHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            store.refresh()
+
+            try:
+                etag, body, gzipped = store.cached_response(
+                    f"{url.path}?{url.query}", lambda: route(store, url.path, query)
+                )
+            except ApiError as e:
+                self.send_json(e.status, json.dumps({'error': e.message}).encode('utf-8'))
+                return
+
+            # The gzip and identity bodies are different representations, so they get different ETags
+            use_gzip = gzipped is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+            if use_gzip:
+                etag = etag[:-1] + '-gzip"'
+
+            if_none_match = [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]
+            if etag in if_none_match or '*' in if_none_match:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Vary', 'Accept-Encoding')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            self.send_json(200, gzipped if use_gzip else body, etag, 'gzip' if use_gzip else None)
+
+        def send_json(self, status, body, etag=None, encoding=None):
+            """Send a JSON body, already encoded as given"""
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Vary', 'Accept-Encoding')
+            if etag:
+                self.send_header('ETag', etag)
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Keep the console quiet under load tests
+            pass
+
+    return ApiHandler
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only JSON API over the project plans")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    store = TaskStore()
+    store.refresh()
+    server = PlanApiServer((args.host, args.port), make_handler(store))
+    print(f"Serving plan API on http://{args.host}:{args.port}/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
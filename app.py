@@ -2,11 +2,22 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.figure_factory as ff
+import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import networkx as nx
 from typing import Dict, List
+import hashlib
 import json
 import os
+import re
+from bisect import bisect_right
+import threading
+import time
+import uuid
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -25,6 +36,10 @@ COMPLEXITY_HOURS = {
     "Complex": 80
 }
 
+# Calibrated estimates need this many completed tasks in a group before replacing the static hours
+CALIBRATION_MIN_SAMPLES = 3
+CALIBRATION_QUANTILES = [0.5, 0.8, 0.9]
+
 STATUS_COLORS = {
     "Completed": "#00FF00",      # Green
     "In Progress": "#FFFF00",    # Yellow
@@ -42,6 +57,66 @@ USERS = {
 # File paths
 TEMPLATE_FILE = "Project-Delivery-Plan test.xlsx"
 PROJECTS_DATA_FILE = "projects_data.json"
+BASELINES_DATA_FILE = "baselines_data.json"
+CALIBRATION_DATA_FILE = "calibration_data.json"
+HISTORY_DATA_FILE = "plan_history.jsonl"
+HISTORY_INDEX_FILE = "plan_history_index.jsonl"
+HISTORY_LOCK = threading.Lock()
+
+# Unified schema: plan columns taken from project data and default values for missing cells
+UNIFIED_PLAN_COLUMNS = [
+    'Task ID', 'Task Name', 'Phase', 'Site', 'Status', 'Owner',
+    'Planned Start', 'Planned Finish', 'Actual Start', 'Actual Finish',
+    'Complexity', 'Effort Hours', 'Duration Days', 'Dependencies'
+]
+UNIFIED_OPTIONAL_COLUMNS = [
+    'Planned Start', 'Planned Finish', 'Actual Start', 'Actual Finish',
+    'Complexity', 'Effort Hours', 'Duration Days', 'Dependencies'
+]
+UNIFIED_DEFAULTS = {
+    "TASK": "", "Task Name": "",
+    "OWNER": "Unassigned", "Owner": "Unassigned",
+    "COMMENT": "", "REF LINK": "",
+    "Phase": "Unknown", "Site": "Unknown", "Status": "Unknown",
+    "Complexity": "Medium",
+    "Effort Hours": 0, "Duration Days": 0,
+    "Dependencies": ""
+}
+
+# Task table pagination
+PAGE_SIZES = [25, 50, 100, 250]
+
+# Plan history: a full checkpoint after this many deltas bounds the replay cost of any past version
+HISTORY_CHECKPOINT_INTERVAL = 20
+
+# Exports are written in chunks so memory stays bounded regardless of plan size
+EXPORT_DIR = "exports"
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_FORMATS = {"CSV": "csv", "Parquet": "parquet", "Excel": "xlsx"}
+
+# Layout of the 'Project Plan - First Site' sheet: (header, source columns in priority order, width)
+TEMPLATE_SHEET_NAME = "Project Plan - First Site"
+TEMPLATE_LAYOUT = [
+    ("Check- Point", [], 11.5),
+    ("", ['Phase'], 14.2),
+    ("Status", ['Status'], 12.0),
+    ("Post Contract sign off", ['TASK', 'Task Name'], 65.5),
+    ("Owner", ['OWNER', 'Owner'], 22.5),
+    ("Effort (hours)", ['Effort Hours'], 13.2),
+    ("Ref Document", ['REF LINK'], 38.5),
+    ("Comment", ['COMMENT'], 29.8),
+    ("Planned Start", ['Planned Start'], 12.5),
+    ("Planned Finish", ['Planned Finish'], 13.5),
+    ("Actual Start", ['Actual Start'], 11.0),
+    ("Actual Finish", ['Actual Finish'], 11.8)
+]
+
+# What-if scenarios keep their own copy of these fields for changed tasks only
+SCENARIO_COLUMNS = ['Task Name', 'Phase', 'Complexity', 'Effort Hours', 'Planned Start', 'Planned Finish']
+
+# Baselines keep only what schedule variance needs, with date-only values
+BASELINE_COLUMNS = ['Task ID', 'Phase', 'Planned Start', 'Planned Finish', 'Actual Start', 'Actual Finish']
+BASELINE_DATE_COLUMNS = ['Planned Start', 'Planned Finish', 'Actual Start', 'Actual Finish']
 
 def login_page():
     """Handle user authentication"""
@@ -270,6 +345,10 @@ def create_project(name, template_df):
     new_project = template_df.copy()
     st.session_state.projects[name] = new_project
     
+    # Completed tasks in the new project feed the duration calibration
+    if 'calibration' in st.session_state and observe_projects(st.session_state.calibration, {name: new_project}):
+        save_calibration(st.session_state.calibration)
+    
     # Save to file
     if save_projects(st.session_state.projects):
         return True, f"Project '{name}' created successfully"
@@ -280,12 +359,106 @@ def delete_project(name):
     """Delete a project"""
     if name in st.session_state.projects:
         del st.session_state.projects[name]
+        # A project created later under the same name is observed afresh
+        if 'calibration' in st.session_state and name in st.session_state.calibration['projects']:
+            st.session_state.calibration['projects'].discard(name)
+            save_calibration(st.session_state.calibration)
         if save_projects(st.session_state.projects):
             return True, f"Project '{name}' deleted successfully"
         else:
             return False, "Error saving changes"
     return False, "Project not found"
 
+def baseline_dates_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Reduce a plan to one row per Task ID with the baseline columns and date-only values"""
+    plan = df.reindex(columns=BASELINE_COLUMNS)
+    plan = plan[plan['Task ID'].notna()].drop_duplicates('Task ID')
+    plan['Task ID'] = plan['Task ID'].astype(str)
+    plan['Phase'] = plan['Phase'].astype(str).where(plan['Phase'].notna())
+    for col in BASELINE_DATE_COLUMNS:
+        plan[col] = pd.to_datetime(plan[col], errors='coerce').dt.normalize()
+    return plan.reset_index(drop=True)
+
+def baseline_snapshot(df: pd.DataFrame) -> Dict[str, list]:
+    """Convert a plan into compact columnar baseline data for storage"""
+    plan = baseline_dates_frame(df)
+    snapshot = {}
+    for col in BASELINE_COLUMNS:
+        values = plan[col].dt.strftime('%Y-%m-%d') if col in BASELINE_DATE_COLUMNS else plan[col]
+        snapshot[col] = values.astype(object).where(values.notna(), None).tolist()
+    return snapshot
+
+def baseline_frame(snapshot: Dict[str, list]) -> pd.DataFrame:
+    """Rebuild a baseline dataframe from its columnar snapshot"""
+    df = pd.DataFrame(snapshot).reindex(columns=BASELINE_COLUMNS)
+    for col in BASELINE_DATE_COLUMNS:
+        df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+def load_baselines():
+    """Load saved baselines from JSON file"""
+    if os.path.exists(BASELINES_DATA_FILE):
+        try:
+            with open(BASELINES_DATA_FILE, 'r') as f:
+                data = json.load(f)
+                # Convert columnar snapshots back to DataFrames
+                baselines = {}
+                for baseline_name, baseline in data.items():
+                    baselines[baseline_name] = {
+                        "saved_at": baseline.get("saved_at", ""),
+                        "saved_by": baseline.get("saved_by", ""),
+                        "data": baseline_frame(baseline.get("columns", {}))
+                    }
+                return baselines
+        except Exception as e:
+            st.warning(f"Error loading baselines: {str(e)}")
+            return {}
+    return {}
+
+def save_baselines(baselines):
+    """Save baselines to JSON file"""
+    try:
+        data_to_save = {}
+        for baseline_name, baseline in baselines.items():
+            data_to_save[baseline_name] = {
+                "saved_at": baseline["saved_at"],
+                "saved_by": baseline["saved_by"],
+                "columns": baseline_snapshot(baseline["data"])
+            }
+        
+        with open(BASELINES_DATA_FILE, 'w') as f:
+            json.dump(data_to_save, f)
+        return True
+    except Exception as e:
+        st.error(f"Error saving baselines: {str(e)}")
+        return False
+
+def save_baseline(name, df):
+    """Save the current plan as a named baseline"""
+    if name in st.session_state.baselines:
+        return False, "Baseline name already exists"
+    
+    st.session_state.baselines[name] = {
+        "saved_at": datetime.now().isoformat(timespec='seconds'),
+        "saved_by": st.session_state.get('username', ''),
+        "data": baseline_dates_frame(df)
+    }
+    
+    if save_baselines(st.session_state.baselines):
+        return True, f"Baseline '{name}' saved"
+    else:
+        return False, "Error saving baseline"
+
+def delete_baseline(name):
+    """Delete a baseline"""
+    if name in st.session_state.baselines:
+        del st.session_state.baselines[name]
+        if save_baselines(st.session_state.baselines):
+            return True, f"Baseline '{name}' deleted successfully"
+        else:
+            return False, "Error saving changes"
+    return False, "Baseline not found"
+
 def calculate_testing_timeline(df: pd.DataFrame, complexity_map: Dict[str, int]) -> pd.DataFrame:
     """Calculate timeline for Testing & Model Training tasks based on complexity"""
     df_copy = df.copy()
@@ -343,61 +516,212 @@ def find_dependency_completion_date(df: pd.DataFrame, task: pd.Series):
     # Return the latest finish date
     return dep_tasks['Planned Finish'].max()
 
-def apply_dependency_chaining(df: pd.DataFrame) -> pd.DataFrame:
-    """Recalculate dependent tasks in correct order using topological sorting"""
-    df_copy = df.copy()
+def new_duration_stats() -> Dict[str, any]:
+    """Empty streaming statistics for task durations in days"""
+    return {'count': 0, 'mean': 0.0, 'm2': 0.0, 'histogram': {}}
+
+def update_duration_stats(stats: Dict[str, any], days: int):
+    """Add one duration: Welford mean/variance plus an exact per-day histogram for quantiles"""
+    stats['count'] += 1
+    delta = days - stats['mean']
+    stats['mean'] += delta / stats['count']
+    stats['m2'] += delta * (days - stats['mean'])
+    stats['histogram'][days] = stats['histogram'].get(days, 0) + 1
+
+def duration_quantile(stats: Dict[str, any], q: float) -> float:
+    """Quantile of the recorded durations, read from the histogram"""
+    target = q * stats['count']
+    cumulative = 0
+    for days in sorted(stats['histogram']):
+        cumulative += stats['histogram'][days]
+        if cumulative >= target:
+            return float(days)
+    return 0.0
+
+def new_calibration() -> Dict[str, any]:
+    """Empty calibration: duration stats per group, the tasks already recorded and the projects observed"""
+    return {'groups': {}, 'recorded': set(), 'projects': set(), 'complexity_hours': dict(COMPLEXITY_HOURS)}
+
+def load_calibration():
+    """Load the duration calibration from JSON file, or None if none has been saved"""
+    if os.path.exists(CALIBRATION_DATA_FILE):
+        try:
+            with open(CALIBRATION_DATA_FILE, 'r') as f:
+                data = json.load(f)
+                # Rebuild group keys and integer histogram days
+                calibration = new_calibration()
+                for group in data.get("groups", []):
+                    calibration['groups'][(group["dimension"], group["value"])] = {
+                        'count': group["count"], 'mean': group["mean"], 'm2': group["m2"],
+                        'histogram': {int(days): count for days, count in group["histogram"].items()}
+                    }
+                calibration['recorded'] = set(data.get("recorded", []))
+                calibration['projects'] = set(data.get("projects", []))
+                calibration['complexity_hours'] = calibrated_complexity_hours(calibration)
+                return calibration
+        except Exception as e:
+            st.warning(f"Error loading calibration: {str(e)}")
+            return None
+    return None
+
+def save_calibration(calibration):
+    """Save the duration calibration to JSON file"""
+    try:
+        data_to_save = {
+            "groups": [
+                {"dimension": dimension, "value": value, "count": stats['count'], "mean": stats['mean'],
+                 "m2": stats['m2'], "histogram": stats['histogram']}
+                for (dimension, value), stats in calibration['groups'].items()
+            ],
+            "recorded": sorted(calibration['recorded']),
+            "projects": sorted(calibration['projects'])
+        }
+        
+        with open(CALIBRATION_DATA_FILE, 'w') as f:
+            json.dump(data_to_save, f)
+        return True
+    except Exception as e:
+        st.error(f"Error saving calibration: {str(e)}")
+        return False
+
+def completed_durations(df: pd.DataFrame) -> pd.DataFrame:
+    """Actual durations in days of completed tasks, with the fields they are calibrated by"""
+    if 'Actual Start' not in df.columns or 'Actual Finish' not in df.columns:
+        return pd.DataFrame(columns=['key', 'Complexity', 'Phase', 'Owner', 'days'])
+    
+    days = (pd.to_datetime(df['Actual Finish'], errors='coerce')
+            - pd.to_datetime(df['Actual Start'], errors='coerce')).dt.days + 1
+    done = days.notna() & days.ge(1)
+    if 'Status' in df.columns:
+        done &= df['Status'].eq('Completed')
+    
+    # Tasks are recorded by Task ID, rows without one by their row label
+    keys = df.index.to_series().astype(str)
+    if 'Task ID' in df.columns:
+        keys = df['Task ID'].astype(str).where(df['Task ID'].notna(), keys)
+    
+    plan = df.reindex(columns=['Complexity', 'Phase', 'Owner', 'OWNER'])
+    durations = pd.DataFrame({
+        'key': keys,
+        'Complexity': plan['Complexity'].fillna('Medium'),
+        'Phase': plan['Phase'].fillna('Unknown'),
+        'Owner': plan['Owner'].fillna(plan['OWNER']).fillna('Unassigned'),
+        'days': days
+    }, index=df.index)
+    return durations[done]
+
+def observe_completed_tasks(calibration: Dict[str, any], source: str, df: pd.DataFrame) -> bool:
+    """Feed newly completed tasks into the calibration, skipping tasks already recorded.
+    
+    Returns True if any task was recorded.
+    """
+    durations = completed_durations(df)
+    keys = source + ':' + durations['key'].astype(str)
+    new = ~keys.isin(calibration['recorded'])
+    if not new.any():
+        return False
     
-    # Create dependency graph
-    G = nx.DiGraph()
+    groups = calibration['groups']
+    for complexity, phase, owner, days in zip(durations.loc[new, 'Complexity'], durations.loc[new, 'Phase'],
+                                             durations.loc[new, 'Owner'], durations.loc[new, 'days']):
+        for group in [('Complexity', complexity), ('Phase', phase), ('Owner', owner),
+                      ('Phase / Complexity', f"{phase} / {complexity}")]:
+            update_duration_stats(groups.setdefault(group, new_duration_stats()), int(days))
     
-    # Add nodes
-    for _, task in df_copy.iterrows():
-        G.add_node(task['Task ID'])
+    calibration['recorded'].update(keys[new])
+    calibration['complexity_hours'] = calibrated_complexity_hours(calibration)
+    return True
+
+def observe_projects(calibration: Dict[str, any], projects: Dict[str, pd.DataFrame]) -> bool:
+    """Feed projects not yet observed into the calibration; returns True if it changed"""
+    changed = False
+    for name, project_df in projects.items():
+        if name not in calibration['projects']:
+            observe_completed_tasks(calibration, f"project:{name}", project_df)
+            calibration['projects'].add(name)
+            changed = True
+    return changed
+
+def calibrated_complexity_hours(calibration: Dict[str, any]) -> Dict[str, int]:
+    """Median actual hours per complexity, preferring Testing & Model Training history"""
+    hours = dict(COMPLEXITY_HOURS)
+    for complexity in COMPLEXITY_HOURS:
+        for group in [('Phase / Complexity', f"Testing & Model Training / {complexity}"), ('Complexity', complexity)]:
+            stats = calibration['groups'].get(group)
+            if stats and stats['count'] >= CALIBRATION_MIN_SAMPLES:
+                hours[complexity] = int(duration_quantile(stats, 0.5) * 8)
+                break
+    return hours
+
+def get_complexity_hours() -> Dict[str, int]:
+    """Hours per complexity used for scheduling: calibrated from actuals, or the static map"""
+    calibration = st.session_state.get('calibration')
+    if calibration is None or not st.session_state.get('use_calibrated_estimates', True):
+        return COMPLEXITY_HOURS
+    return calibration['complexity_hours']
+
+def calibration_table(calibration: Dict[str, any]) -> pd.DataFrame:
+    """Duration distribution per calibration group"""
+    rows = []
+    for (dimension, value), stats in sorted(calibration['groups'].items(), key=lambda item: str(item[0])):
+        row = {
+            "Dimension": dimension,
+            "Value": value,
+            "Samples": stats['count'],
+            "Mean (days)": round(stats['mean'], 1),
+            "Std Dev (days)": round(np.sqrt(stats['m2'] / (stats['count'] - 1)), 1) if stats['count'] > 1 else 0.0
+        }
+        for q in CALIBRATION_QUANTILES:
+            row[f"P{int(q * 100)} (days)"] = duration_quantile(stats, q)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def task_duration_days(task: pd.Series) -> int:
+    """Duration in days: complexity-driven for Testing & Model Training, otherwise from planned dates"""
+    if task.get('Phase') == 'Testing & Model Training':
+        effort_hours = get_complexity_hours().get(task.get('Complexity', 'Medium'), 40)
+        return max(1, int(np.ceil(effort_hours / 8)))
+    
+    # For non-testing tasks, calculate duration from existing dates or default
+    if pd.notna(task.get('Planned Start')) and pd.notna(task.get('Planned Finish')):
+        return (task['Planned Finish'] - task['Planned Start']).days + 1
+    return 1
+
+def apply_dependency_chaining(df: pd.DataFrame, task_index: pd.Series = None) -> pd.DataFrame:
+    """Recalculate dependent tasks in correct order using topological sorting"""
+    df_copy = df.copy()
     
-    # Add edges
-    for _, task in df_copy.iterrows():
-        dependencies = task.get('Dependencies', '')
-        if dependencies:
-            dep_ids = [dep.strip() for dep in dependencies.split(',') if dep.strip()]
-            for dep_id in dep_ids:
-                if dep_id in G.nodes:
-                    G.add_edge(dep_id, task['Task ID'])
+    # Create dependency graph; rows without a Task ID are not part of it
+    G = build_dependency_graph(df_copy)
+    if task_index is None:
+        task_index = build_task_index(df_copy)
     
     # Check for circular dependencies
     try:
         # Get topological order
         topo_order = list(nx.topological_sort(G))
-    except nx.NetworkXError:
+    except nx.NetworkXUnfeasible:
         st.error("⚠️ Circular dependencies detected! Please fix your task dependencies.")
         return df_copy
     
     # Process tasks in topological order
     for task_id in topo_order:
-        task_idx = df_copy[df_copy['Task ID'] == task_id].index[0]
-        task = df_copy.loc[task_idx]
+        dep_ids = list(G.predecessors(task_id))
         
         # Skip if no dependencies
-        if not task.get('Dependencies'):
+        if not dep_ids:
             continue
         
         # Find dependency completion date
-        dependency_date = find_dependency_completion_date(df_copy, task)
+        task_idx = task_index[task_id]
+        dependency_date = df_copy.loc[task_index[dep_ids].to_numpy(), 'Planned Finish'].max()
         
-        if dependency_date:
+        if pd.notna(dependency_date):
             # Calculate new start date
             new_start = dependency_date + timedelta(days=1)
             
             # Calculate duration
-            if task['Phase'] == 'Testing & Model Training':
-                complexity = task.get('Complexity', 'Medium')
-                effort_hours = COMPLEXITY_HOURS.get(complexity, 40)
-                duration_days = max(1, int(np.ceil(effort_hours / 8)))
-            else:
-                # For non-testing tasks, calculate duration from existing dates or default
-                if pd.notna(task['Planned Start']) and pd.notna(task['Planned Finish']):
-                    duration_days = (task['Planned Finish'] - task['Planned Start']).days + 1
-                else:
-                    duration_days = 1
+            duration_days = task_duration_days(df_copy.loc[task_idx])
             
             # Update dates
             df_copy.loc[task_idx, 'Planned Start'] = new_start
@@ -405,6 +729,245 @@ def apply_dependency_chaining(df: pd.DataFrame) -> pd.DataFrame:
     
     return df_copy
 
+def task_durations(df: pd.DataFrame) -> pd.Series:
+    """Vectorized task_duration_days for a whole plan"""
+    testing = df['Phase'].eq('Testing & Model Training')
+    effort_hours = df['Complexity'].map(get_complexity_hours()).fillna(40)
+    complexity_days = np.maximum(1, np.ceil(effort_hours / 8))
+    date_days = ((pd.to_datetime(df['Planned Finish'], errors='coerce')
+                  - pd.to_datetime(df['Planned Start'], errors='coerce')).dt.days + 1).fillna(1)
+    return pd.Series(np.where(testing, complexity_days, date_days), index=df.index).astype(int)
+
+def calculate_critical_path(df: pd.DataFrame) -> Dict[str, any]:
+    """Find the longest chain of dependent tasks by duration"""
+    G = build_dependency_graph(df)
+    tasks = df[df['Task ID'].astype(str).isin(G.nodes)].drop_duplicates('Task ID') if G else df.iloc[0:0]
+    durations = dict(zip(tasks['Task ID'].astype(str), task_durations(tasks))) if G else {}
+    
+    try:
+        order = list(nx.topological_sort(G))
+    except nx.NetworkXUnfeasible:
+        return {'task_ids': [], 'duration_days': 0, 'circular_dependencies': True}
+    
+    # Longest path over the DAG: each task finishes after its longest predecessor chain
+    chain_days, previous = {}, {}
+    for task_id in order:
+        predecessor = max(G.predecessors(task_id), key=lambda dep_id: chain_days[dep_id], default=None)
+        chain_days[task_id] = durations.get(task_id, 1) + (chain_days[predecessor] if predecessor is not None else 0)
+        previous[task_id] = predecessor
+    
+    if not chain_days:
+        return {'task_ids': [], 'duration_days': 0, 'circular_dependencies': False}
+    
+    task_id = max(chain_days, key=chain_days.get)
+    path = []
+    while task_id is not None:
+        path.append(task_id)
+        task_id = previous[task_id]
+    
+    return {
+        'task_ids': path[::-1],
+        'duration_days': int(chain_days[path[0]]),
+        'circular_dependencies': False
+    }
+
+def build_dependency_graph(df: pd.DataFrame) -> nx.DiGraph:
+    """Build the Task ID dependency graph (edges point from dependency to dependent task)"""
+    G = nx.DiGraph()
+    if 'Task ID' not in df.columns:
+        return G
+    
+    tasks = df[df['Task ID'].notna() & df['Task ID'].astype(str).str.strip().ne('')]
+    task_ids = tasks['Task ID'].astype(str)
+    G.add_nodes_from(task_ids)
+    
+    dependencies = tasks['Dependencies'].fillna('').astype(str) if 'Dependencies' in tasks.columns else ''
+    edges = pd.DataFrame({'task': task_ids, 'dependency': dependencies}).assign(
+        dependency=lambda edges: edges['dependency'].str.split(',')
+    ).explode('dependency')
+    edges['dependency'] = edges['dependency'].str.strip()
+    edges = edges[edges['dependency'].isin(G.nodes)]
+    G.add_edges_from(zip(edges['dependency'], edges['task']))
+    return G
+
+def get_dependency_graph() -> nx.DiGraph:
+    """Return the dependency graph of the unified data, rebuilt once per data version"""
+    cached = st.session_state.get('dependency_graph')
+    if cached is None or cached[0] != st.session_state.unified_version:
+        cached = (st.session_state.unified_version, build_dependency_graph(st.session_state.unified_data))
+        st.session_state.dependency_graph = cached
+    return cached[1]
+
+def reschedule_scenario(base_df: pd.DataFrame, task_index: pd.Series, graph: nx.DiGraph,
+                        overrides: Dict[str, Dict]) -> pd.DataFrame:
+    """Apply scenario overrides and reschedule only the overridden tasks and their dependents.
+    
+    Returns the changed rows indexed by Task ID; every other task is shared with the base plan.
+    Overridden dates are pinned, other affected tasks start the day after their latest dependency.
+    """
+    changed = [task_id for task_id in overrides if task_id in task_index.index and task_id in graph]
+    affected = set(changed)
+    for task_id in changed:
+        affected |= nx.descendants(graph, task_id)
+    
+    try:
+        order = list(nx.topological_sort(graph.subgraph(affected)))
+    except nx.NetworkXUnfeasible:
+        st.error("⚠️ Circular dependencies detected! Please fix your task dependencies.")
+        order = []
+    
+    base_rows = base_df.loc[task_index[order].to_numpy()].reindex(columns=SCENARIO_COLUMNS)
+    base_rows.index = pd.Index(order, name='Task ID')
+    rows = base_rows.copy()
+    
+    # Apply overrides to the scenario's own copy of the changed rows
+    for task_id, fields in overrides.items():
+        if task_id not in rows.index:
+            continue
+        for field, value in fields.items():
+            rows.loc[task_id, field] = pd.Timestamp(value) if field in ['Planned Start', 'Planned Finish'] else value
+        if 'Complexity' in fields and rows.loc[task_id, 'Phase'] == 'Testing & Model Training':
+            rows.loc[task_id, 'Effort Hours'] = get_complexity_hours().get(fields['Complexity'], 40)
+    
+    for task_id in order:
+        pinned = overrides.get(task_id, {})
+        
+        # Durations come from the base dates so pinned dates do not stretch the task
+        duration_days = task_duration_days(pd.concat([
+            rows.loc[task_id, ['Phase', 'Complexity']],
+            base_rows.loc[task_id, ['Planned Start', 'Planned Finish']]
+        ]))
+        
+        start = rows.loc[task_id, 'Planned Start']
+        if 'Planned Start' not in pinned:
+            dependency_finishes = [
+                rows.loc[dep_id, 'Planned Finish'] if dep_id in affected
+                else base_df.at[task_index[dep_id], 'Planned Finish']
+                for dep_id in graph.predecessors(task_id)
+            ]
+            dependency_finishes = [finish for finish in dependency_finishes if pd.notna(finish)]
+            if dependency_finishes:
+                start = max(dependency_finishes) + timedelta(days=1)
+                rows.loc[task_id, 'Planned Start'] = start
+        
+        if 'Planned Finish' not in pinned and pd.notna(start):
+            rows.loc[task_id, 'Planned Finish'] = start + timedelta(days=duration_days - 1)
+    
+    return rows
+
+def materialize_scenario(base_df: pd.DataFrame, task_index: pd.Series, scenario_rows: pd.DataFrame) -> pd.DataFrame:
+    """Overlay a scenario's changed rows on a copy of the base plan for display"""
+    df = base_df.copy()
+    labels = task_index[scenario_rows.index].to_numpy()
+    for col in scenario_rows.columns:
+        if col in df.columns:
+            df.loc[labels, col] = scenario_rows[col].to_numpy()
+    return df
+
+def reference_overrides(base_df: pd.DataFrame, task_index: pd.Series, overrides: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Overrides for the no-change reference: the same tasks, with pinned dates kept at their base values"""
+    reference = {}
+    for task_id, fields in overrides.items():
+        if task_id not in task_index.index:
+            continue
+        base_task = base_df.loc[task_index[task_id]]
+        reference[task_id] = {
+            field: base_task[field] for field in ['Planned Start', 'Planned Finish']
+            if field in fields and pd.notna(base_task.get(field))
+        }
+    return reference
+
+def summarize_scenario(base_df: pd.DataFrame, task_index: pd.Series, reference_rows: pd.DataFrame,
+                       scenario_rows: pd.DataFrame) -> Dict[str, any]:
+    """Summarize how a scenario changes the plan, touching only its changed rows.
+    
+    The scenario is compared with the same tasks rescheduled without its overrides, so only
+    changes caused by the overrides are counted.
+    """
+    reference_rows = reference_rows.reindex(scenario_rows.index)
+    
+    def dates(rows, col):
+        return pd.to_datetime(rows[col], errors='coerce')
+    
+    start_shift = (dates(scenario_rows, 'Planned Start') - dates(reference_rows, 'Planned Start')).dt.days
+    finish_shift = (dates(scenario_rows, 'Planned Finish') - dates(reference_rows, 'Planned Finish')).dt.days
+    
+    # The project finish is the latest of the untouched base tasks and the rescheduled tasks
+    labels = task_index[scenario_rows.index].to_numpy()
+    untouched_finish = base_df['Planned Finish'].drop(index=labels).max()
+    
+    def project_finish(rows):
+        return max(
+            [finish for finish in [untouched_finish, dates(rows, 'Planned Finish').max()] if pd.notna(finish)],
+            default=pd.NaT
+        )
+    
+    scenario_finish = project_finish(scenario_rows)
+    reference_finish = project_finish(reference_rows)
+    
+    return {
+        'tasks_rescheduled': int((start_shift.fillna(0).ne(0) | finish_shift.fillna(0).ne(0)).sum()),
+        'project_finish': scenario_finish,
+        'project_shift_days': (scenario_finish - reference_finish).days
+        if pd.notna(scenario_finish) and pd.notna(reference_finish) else 0,
+        'effort_hours_change': float(
+            pd.to_numeric(scenario_rows['Effort Hours'], errors='coerce').sum()
+            - pd.to_numeric(reference_rows['Effort Hours'], errors='coerce').sum()
+        )
+    }
+
+def create_scenario(name):
+    """Create an empty what-if scenario on top of the current plan"""
+    if name in st.session_state.scenarios:
+        return False, "Scenario name already exists"
+    
+    st.session_state.scenarios[name] = {"overrides": {}, "revision": 0, "result": None}
+    return True, f"Scenario '{name}' created successfully"
+
+def delete_scenario(name):
+    """Delete a what-if scenario"""
+    if name in st.session_state.scenarios:
+        del st.session_state.scenarios[name]
+        return True, f"Scenario '{name}' deleted successfully"
+    return False, "Scenario not found"
+
+def set_scenario_override(name, task_id, fields: Dict):
+    """Record overridden fields for one task in a scenario"""
+    scenario = st.session_state.scenarios[name]
+    scenario["overrides"].setdefault(task_id, {}).update(fields)
+    scenario["revision"] += 1
+
+def slip_override(task_id: str, scenario: Dict, days: int) -> Dict:
+    """Dates that slip a task by a number of days, compounding any earlier slip in the scenario"""
+    base_task = st.session_state.unified_data.loc[st.session_state.unified_task_index[task_id]]
+    current = scenario["overrides"].get(task_id, {})
+    fields = {}
+    for col in ['Planned Start', 'Planned Finish']:
+        date = current.get(col, base_task.get(col))
+        if pd.notna(date):
+            fields[col] = pd.Timestamp(date) + timedelta(days=int(days))
+    return fields
+
+def get_scenario_result(name):
+    """Return a scenario's changed rows and summary, recomputed only when the plan or overrides change.
+    
+    The no-override reference used by the summary is rebuilt and cached together with the scenario.
+    """
+    scenario = st.session_state.scenarios[name]
+    cache_key = (st.session_state.unified_version, scenario["revision"], tuple(get_complexity_hours().items()))
+    
+    if scenario["result"] is None or scenario["result"][0] != cache_key:
+        base_df = st.session_state.unified_data
+        task_index = st.session_state.unified_task_index
+        graph = get_dependency_graph()
+        rows = reschedule_scenario(base_df, task_index, graph, scenario["overrides"])
+        reference_rows = reschedule_scenario(
+            base_df, task_index, graph, reference_overrides(base_df, task_index, scenario["overrides"])
+        )
+        scenario["result"] = (cache_key, rows, summarize_scenario(base_df, task_index, reference_rows, rows))
+    
+    return scenario["result"][1], scenario["result"][2]
+
 def apply_filters(df: pd.DataFrame, site_filter: str, phase_filter: str, status_filter: str) -> pd.DataFrame:
     """Apply filters to the dataframe"""
     filtered_df = df.copy()
@@ -420,13 +983,24 @@ def apply_filters(df: pd.DataFrame, site_filter: str, phase_filter: str, status_
     
     return filtered_df
 
-def generate_gantt(df: pd.DataFrame):
-    """Generate Gantt chart using Plotly"""
+def task_status_color(status: str, finish) -> str:
+    """Gantt color for a task status, flagging unstarted tasks past their finish as delayed"""
+    if status == 'Completed':
+        return STATUS_COLORS['Completed']
+    elif status == 'In Progress':
+        return STATUS_COLORS['In Progress']
+    elif status == 'Yet to Start' and finish < datetime.now():
+        return STATUS_COLORS['Delayed']
+    return STATUS_COLORS['Yet to Start']
+
+def generate_gantt(df: pd.DataFrame, baseline_df: pd.DataFrame = None):
+    """Generate Gantt chart using Plotly, optionally overlaying baseline dates"""
     if df.empty:
         return None
     
     # Prepare data for Gantt chart
     gantt_data = []
+    gantt_task_ids = []
     
     for _, task in df.iterrows():
         if pd.notna(task.get('Planned Start')) and pd.notna(task.get('Planned Finish')):
@@ -435,18 +1009,7 @@ def generate_gantt(df: pd.DataFrame):
             
             # Determine status color
             status = task['Status']
-            if status == 'Completed':
-                color = STATUS_COLORS['Completed']
-            elif status == 'In Progress':
-                color = STATUS_COLORS['In Progress']
-            elif status == 'Yet to Start':
-                # Check if delayed
-                if finish < datetime.now():
-                    color = STATUS_COLORS['Delayed']
-                else:
-                    color = STATUS_COLORS['Yet to Start']
-            else:
-                color = STATUS_COLORS['Yet to Start']
+            color = task_status_color(status, finish)
             
             gantt_data.append(dict(
                 Task=f"{task['Task ID']}: {task['Task Name']}",
@@ -457,6 +1020,7 @@ def generate_gantt(df: pd.DataFrame):
                 Phase=task.get('Phase', 'Unknown'),
                 Color=color
             ))
+            gantt_task_ids.append(str(task['Task ID']))
     
     if not gantt_data:
         return None
@@ -477,8 +1041,41 @@ def generate_gantt(df: pd.DataFrame):
         yaxis_title='Tasks'
     )
     
+    if baseline_df is not None and not baseline_df.empty:
+        add_baseline_overlay(fig, gantt_task_ids, baseline_df)
+    
     return fig
 
+def add_baseline_overlay(fig, gantt_task_ids: List[str], baseline_df: pd.DataFrame):
+    """Draw baseline dates as thin grey bars under each Gantt task"""
+    # Gantt rows are plotted at y = 0..n-1 in the order of the task list
+    baseline_dates = baseline_df.drop_duplicates('Task ID').set_index('Task ID').reindex(gantt_task_ids)
+    has_dates = (baseline_dates['Planned Start'].notna() & baseline_dates['Planned Finish'].notna()).to_numpy()
+    if not has_dates.any():
+        return
+    
+    rows = np.flatnonzero(has_dates)
+    # Timestamps, not datetime64 values, so plotly serializes them as dates rather than nanoseconds
+    starts = baseline_dates['Planned Start'].iloc[rows].tolist()
+    finishes = baseline_dates['Planned Finish'].iloc[rows].tolist()
+    labels = [
+        f"Baseline {task_id}: {start:%Y-%m-%d} → {finish:%Y-%m-%d}"
+        for task_id, start, finish in zip(baseline_dates.index[rows], starts, finishes)
+    ]
+    
+    # One trace with None separators keeps the overlay to a single series
+    x, y, text = [], [], []
+    for row, start, finish, label in zip(rows, starts, finishes, labels):
+        x += [start, finish, None]
+        y += [row - 0.35, row - 0.35, None]
+        text += [label, label, None]
+    
+    fig.add_trace(go.Scatter(
+        x=x, y=y, mode='lines', name='Baseline',
+        line=dict(color='#808080', width=4),
+        hovertext=text, hoverinfo='text'
+    ))
+
 def update_task(df: pd.DataFrame, task_id: str, field: str, value) -> pd.DataFrame:
     """Update a single task field"""
     df_copy = df.copy()
@@ -496,7 +1093,7 @@ def update_task(df: pd.DataFrame, task_id: str, field: str, value) -> pd.DataFra
     
     # If updating complexity for testing tasks, recalculate effort hours
     if field == 'Complexity' and df_copy.loc[task_idx, 'Phase'] == 'Testing & Model Training':
-        effort_hours = COMPLEXITY_HOURS.get(value, 40)
+        effort_hours = get_complexity_hours().get(value, 40)
         df_copy.loc[task_idx, 'Effort Hours'] = effort_hours
     
     # If updating dates, recalculate dependencies
@@ -538,66 +1135,500 @@ def calculate_project_kpis(df: pd.DataFrame) -> Dict[str, any]:
         'active_phases': active_phases
     }
 
+def compare_to_baseline(current_df: pd.DataFrame, baseline_df: pd.DataFrame) -> pd.DataFrame:
+    """Compare the current plan with a baseline by Task ID (variances in days, positive means later)"""
+    current = baseline_dates_frame(current_df)
+    merged = current.merge(
+        baseline_df.drop_duplicates('Task ID'), on='Task ID', how='outer',
+        suffixes=('', ' (Baseline)'), indicator=True
+    )
+    
+    variance = pd.DataFrame({
+        'Task ID': merged['Task ID'],
+        'Phase': merged['Phase'].fillna(merged['Phase (Baseline)']).fillna('Unknown'),
+        'Baseline Start': merged['Planned Start (Baseline)'],
+        'Baseline Finish': merged['Planned Finish (Baseline)'],
+        'Planned Start': merged['Planned Start'],
+        'Planned Finish': merged['Planned Finish'],
+        'Actual Finish': merged['Actual Finish'],
+        'Start Variance Days': (merged['Planned Start'] - merged['Planned Start (Baseline)']).dt.days,
+        'Finish Variance Days': (merged['Planned Finish'] - merged['Planned Finish (Baseline)']).dt.days,
+        'Actual Slip Days': (merged['Actual Finish'] - merged['Planned Finish (Baseline)']).dt.days
+    })
+    
+    # Tasks present in both plans are "Moved" when rescheduling changed either date
+    moved = variance['Start Variance Days'].fillna(0).ne(0) | variance['Finish Variance Days'].fillna(0).ne(0)
+    variance['Change'] = np.select(
+        [merged['_merge'].eq('left_only'), merged['_merge'].eq('right_only'), moved],
+        ['Added', 'Removed', 'Moved'],
+        default='Unchanged'
+    )
+    return variance
+
+def summarize_variance(variance: pd.DataFrame) -> Dict[str, any]:
+    """Summarize schedule variance overall and per phase"""
+    compared = variance[variance['Change'].isin(['Moved', 'Unchanged'])]
+    
+    def mean_days(values):
+        return float(values.mean()) if values.notna().any() else 0.0
+    
+    phase_variance = compared.groupby('Phase', dropna=False).agg(
+        Tasks=('Task ID', 'size'),
+        Moved=('Change', lambda change: int(change.eq('Moved').sum())),
+        **{
+            'Avg Finish Variance (days)': ('Finish Variance Days', 'mean'),
+            'Max Finish Variance (days)': ('Finish Variance Days', 'max'),
+            'Avg Actual Slip (days)': ('Actual Slip Days', 'mean')
+        }
+    ).reset_index()
+    
+    return {
+        'tasks_compared': len(compared),
+        'tasks_moved': int(variance['Change'].eq('Moved').sum()),
+        'tasks_added': int(variance['Change'].eq('Added').sum()),
+        'tasks_removed': int(variance['Change'].eq('Removed').sum()),
+        'avg_finish_variance': mean_days(compared['Finish Variance Days']),
+        'max_finish_variance': float(compared['Finish Variance Days'].max()) if compared['Finish Variance Days'].notna().any() else 0.0,
+        'avg_actual_slip': mean_days(compared['Actual Slip Days']),
+        'phase_variance': phase_variance
+    }
+
+def get_baseline_variance(name: str):
+    """Return the variance table and summary for a baseline, cached per data version"""
+    baseline = st.session_state.baselines[name]
+    cache_key = (name, baseline['saved_at'], st.session_state.unified_version)
+    
+    # Only the current data version is kept, older entries can never be hit again
+    cache = {
+        key: value for key, value in st.session_state.get('variance_cache', {}).items()
+        if key[2] == st.session_state.unified_version
+    }
+    if cache_key not in cache:
+        variance = compare_to_baseline(st.session_state.unified_data, baseline['data'])
+        cache[cache_key] = (variance, summarize_variance(variance))
+    
+    st.session_state.variance_cache = cache
+    return cache[cache_key]
+
+def blank_mask(df: pd.DataFrame) -> pd.DataFrame:
+    """Mark cells that are missing or contain only whitespace"""
+    return df.isna() | df.astype(str).apply(lambda col: col.str.strip().eq(''))
+
+def columns_with_data(df: pd.DataFrame) -> List[str]:
+    """Return the columns that have at least one non-blank cell"""
+    if df.empty:
+        return []
+    return list(df.columns[~blank_mask(df).all()])
+
 def create_unified_dataframe(template_df, demo_df):
     """Create a unified dataframe combining template and demo data with only columns that have data"""
     
-    # Get columns that have actual data in template
-    template_columns = []
-    for col in template_df.columns:
-        if template_df[col].str.strip().ne('').any():
-            template_columns.append(col)
-    
-    # Get columns that have actual data in demo
-    demo_columns = []
-    for col in demo_df.columns:
-        if demo_df[col].notna().any() and demo_df[col].astype(str).str.strip().ne('').any():
-            demo_columns.append(col)
-    
-    # Create unified dataframe with common columns and data
-    unified_data = []
-    
-    # Add template data
-    for _, row in template_df.iterrows():
-        unified_row = {}
-        for col in template_columns:
-            unified_row[col] = row[col]
-        unified_data.append(unified_row)
-    
-    # Add demo data (only columns that have data)
-    for _, row in demo_df.iterrows():
-        unified_row = {}
-        for col in demo_columns:
-            if col in ['Task ID', 'Task Name', 'Phase', 'Site', 'Status', 'Owner']:
-                unified_row[col] = row[col]
-            elif col in ['Planned Start', 'Planned Finish', 'Actual Start', 'Actual Finish']:
-                if pd.notna(row[col]):
-                    unified_row[col] = row[col]
-            elif col in ['Complexity', 'Effort Hours', 'Duration Days', 'Dependencies']:
-                if pd.notna(row[col]) and str(row[col]).strip():
-                    unified_row[col] = row[col]
-        unified_data.append(unified_row)
-    
-    # Create DataFrame and fill missing values
-    unified_df = pd.DataFrame(unified_data)
+    # Template columns are copied as-is when they carry any data
+    template_part = template_df[columns_with_data(template_df)]
+    
+    # Demo columns follow the unified schema; blank optional cells become missing
+    demo_columns = [col for col in UNIFIED_PLAN_COLUMNS if col in columns_with_data(demo_df)]
+    demo_part = demo_df[demo_columns]
+    optional_columns = [col for col in demo_columns if col in UNIFIED_OPTIONAL_COLUMNS]
+    if optional_columns:
+        demo_part = demo_part.copy()
+        demo_part[optional_columns] = demo_part[optional_columns].mask(blank_mask(demo_part[optional_columns]))
+    
+    unified_df = pd.concat([template_part, demo_part], ignore_index=True)
     
     # Fill missing values with appropriate defaults
-    for col in unified_df.columns:
-        if col in ['TASK', 'Task Name']:
-            unified_df[col] = unified_df[col].fillna('')
-        elif col in ['OWNER', 'Owner']:
-            unified_df[col] = unified_df[col].fillna('Unassigned')
-        elif col in ['COMMENT', 'REF LINK']:
-            unified_df[col] = unified_df[col].fillna('')
-        elif col in ['Phase', 'Site', 'Status']:
-            unified_df[col] = unified_df[col].fillna('Unknown')
-        elif col in ['Complexity']:
-            unified_df[col] = unified_df[col].fillna('Medium')
-        elif col in ['Effort Hours', 'Duration Days']:
-            unified_df[col] = unified_df[col].fillna(0)
-        elif col in ['Dependencies']:
-            unified_df[col] = unified_df[col].fillna('')
-    
-    return unified_df
+    defaults = {col: value for col, value in UNIFIED_DEFAULTS.items() if col in unified_df.columns}
+    return unified_df.fillna(defaults)
+
+def build_task_index(df: pd.DataFrame) -> pd.Series:
+    """Map each Task ID to its row label so edits can be written back by Task ID"""
+    if 'Task ID' not in df.columns:
+        return pd.Series(dtype=object)
+    
+    task_ids = df['Task ID']
+    task_ids = task_ids[task_ids.notna() & task_ids.astype(str).str.strip().ne('') & ~task_ids.duplicated()]
+    return pd.Series(task_ids.index, index=task_ids.astype(str).values)
+
+def build_search_index(df: pd.DataFrame) -> pd.Series:
+    """Build one lower-cased text per row so searches are a single substring scan"""
+    search_text = pd.Series('', index=df.index)
+    for col in df.columns:
+        search_text = search_text + '\x1f' + df[col].fillna('').astype(str).str.lower()
+    return search_text
+
+def new_history(owner: str = '') -> Dict[str, any]:
+    """Empty plan history index for one user: entry metadata by time and by id"""
+    return {'owner': owner, 'entries': [], 'times': [], 'by_id': {}, 'head': None}
+
+def plan_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a plan, used to tell whether it differs from a recorded version"""
+    row_hashes = pd.util.hash_pandas_object(df.astype(object), index=True).to_numpy()
+    return hashlib.sha1(row_hashes.tobytes() + repr(list(df.columns)).encode('utf-8')).hexdigest()
+
+def history_snapshot(df: pd.DataFrame) -> Dict[str, any]:
+    """Convert plan rows into compact columnar data with date-only values for storage"""
+    date_columns = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+    columns = {}
+    for col in df.columns:
+        values = df[col].dt.strftime('%Y-%m-%d') if col in date_columns else df[col]
+        columns[col] = values.astype(object).where(values.notna(), None).tolist()
+    return {'index': df.index.tolist(), 'date_columns': date_columns, 'columns': columns}
+
+def history_frame(snapshot: Dict[str, any]) -> pd.DataFrame:
+    """Rebuild plan rows from their columnar history snapshot"""
+    df = pd.DataFrame(snapshot['columns'], index=snapshot['index'])
+    for col in snapshot['date_columns']:
+        df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+def index_history_entry(history: Dict[str, any], meta: Dict[str, any]):
+    """Add a stored history entry to the in-memory index"""
+    entry = dict(meta, timestamp=datetime.fromisoformat(meta['timestamp']))
+    history['entries'].append(entry)
+    history['times'].append(entry['timestamp'])
+    history['by_id'][entry['id']] = entry
+
+def load_history(owner: str = ''):
+    """Load one user's plan history index from the metadata file; the plan data stays on disk"""
+    history = new_history(owner)
+    if os.path.exists(HISTORY_INDEX_FILE):
+        try:
+            with open(HISTORY_INDEX_FILE, 'r') as f:
+                for line in f:
+                    meta = json.loads(line)
+                    if meta['owner'] == owner:
+                        index_history_entry(history, meta)
+            # Sessions append concurrently, so order by time for lookups
+            history['entries'].sort(key=lambda entry: entry['timestamp'])
+            history['times'] = [entry['timestamp'] for entry in history['entries']]
+        except Exception as e:
+            st.warning(f"Error loading plan history: {str(e)}")
+            return new_history(owner)
+    return history
+
+def append_history_entry(meta: Dict[str, any], data: Dict[str, any]):
+    """Append an entry's data to the history file and its metadata to the index, returning the metadata"""
+    try:
+        # Sessions share the files, so the data offset and both appends must not interleave
+        with HISTORY_LOCK:
+            with open(HISTORY_DATA_FILE, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write((json.dumps(data, default=str) + '\n').encode('utf-8'))
+            meta = dict(meta, offset=offset)
+            with open(HISTORY_INDEX_FILE, 'a') as f:
+                f.write(json.dumps(meta) + '\n')
+        return meta
+    except Exception as e:
+        st.error(f"Error saving plan history: {str(e)}")
+        return None
+
+def read_history_entry(offset: int) -> Dict[str, any]:
+    """Read the data of one history entry from the history file"""
+    with open(HISTORY_DATA_FILE, 'rb') as f:
+        f.seek(offset)
+        return json.loads(f.readline())
+
+def plan_delta(previous: pd.DataFrame, current: pd.DataFrame, changed_labels: List = None):
+    """Rows added or changed since the previous version, and the row labels deleted"""
+    deleted = list(previous.index.difference(current.index))
+    
+    if changed_labels is None:
+        common = current.index.intersection(previous.index)
+        before = previous.loc[common, current.columns]
+        after = current.loc[common]
+        differs = (after.ne(before) & ~(after.isna() & before.isna())).any(axis=1)
+        changed = common[differs.to_numpy()].append(current.index.difference(previous.index))
+    else:
+        changed = current.index.intersection(changed_labels)
+    
+    return current.loc[changed].copy(), deleted
+
+def record_history(history: Dict[str, any], previous: pd.DataFrame, current: pd.DataFrame,
+                   changed_labels: List = None):
+    """Record a new plan version as a checkpoint or as a delta from the previous version"""
+    fingerprint = plan_fingerprint(current)
+    head = history['by_id'].get(history['head'])
+    
+    # A new session continues from the latest recorded version when the plan has not changed since
+    if head is None and previous is None and history['entries']:
+        if history['entries'][-1]['fingerprint'] == fingerprint:
+            history['head'] = history['entries'][-1]['id']
+            return
+    if head is not None and head['fingerprint'] == fingerprint:
+        return
+    
+    # Schema changes cannot be expressed as row deltas, so they start a new checkpoint
+    needs_checkpoint = (
+        previous is None
+        or head is None
+        or not previous.columns.equals(current.columns)
+        or head['depth'] >= HISTORY_CHECKPOINT_INTERVAL
+    )
+    
+    meta = {'id': uuid.uuid4().hex, 'owner': history['owner'], 'timestamp': datetime.now().isoformat(),
+            'fingerprint': fingerprint}
+    if needs_checkpoint:
+        meta.update(parent=None, depth=0)
+        data = history_snapshot(current)
+    else:
+        # Deltas name their parent entry, so versions from concurrent sessions never replay into each other
+        rows, deleted = plan_delta(previous, current, changed_labels)
+        meta.update(parent=head['id'], depth=head['depth'] + 1)
+        data = {'rows': history_snapshot(rows), 'deleted': deleted}
+    
+    # Only the metadata is kept in memory; checkpoint and delta data are read back from disk on demand
+    meta = append_history_entry(meta, data)
+    if meta is not None:
+        index_history_entry(history, meta)
+        history['head'] = meta['id']
+
+def plan_at(history: Dict[str, any], timestamp: datetime):
+    """Rebuild the plan as it was at a timestamp from its checkpoint and the deltas leading to it.
+    
+    Returns (dataframe, version), or (None, None) if the timestamp is before the first recorded version.
+    """
+    position = bisect_right(history['times'], timestamp) - 1
+    if position < 0:
+        return None, None
+    
+    chain = [history['entries'][position]]
+    while chain[-1]['parent'] is not None:
+        chain.append(history['by_id'][chain[-1]['parent']])
+    chain.reverse()
+    
+    df = history_frame(read_history_entry(chain[0]['offset']))
+    for entry in chain[1:]:
+        delta = read_history_entry(entry['offset'])
+        df = df.drop(index=df.index.intersection(delta['deleted']))
+        rows = history_frame(delta['rows'])
+        existing = rows.index.intersection(df.index)
+        if len(existing):
+            df.loc[existing, rows.columns] = rows.loc[existing]
+        df = pd.concat([df, rows.loc[rows.index.difference(df.index)]])
+    
+    return df, position + 1
+
+def get_plan_at(timestamp: datetime):
+    """Plan as of a timestamp, reusing the last rebuild while the resolved version is unchanged"""
+    history = st.session_state.history
+    position = bisect_right(history['times'], timestamp) - 1
+    resolved = history['entries'][position]['id'] if position >= 0 else None
+    
+    cached = st.session_state.get('history_view')
+    if cached is None or cached[0] != resolved:
+        cached = (resolved,) + plan_at(history, timestamp)
+        st.session_state.history_view = cached
+    return cached[1], cached[2]
+
+def set_unified_data(df: pd.DataFrame, changed_labels: List = None):
+    """Store a new version of the unified data together with its columns-with-data mask"""
+    previous = st.session_state.get('unified_data')
+    st.session_state.unified_data = df
+    
+    # Only the changed rows can hold newly completed tasks for the calibration
+    if 'calibration' in st.session_state:
+        if observe_completed_tasks(st.session_state.calibration, 'plan',
+                                   df if changed_labels is None else df.loc[df.index.intersection(changed_labels)]):
+            save_calibration(st.session_state.calibration)
+    st.session_state.unified_version = st.session_state.get('unified_version', 0) + 1
+    
+    # Every version is kept in the persisted plan history for time travel
+    if 'history' not in st.session_state:
+        st.session_state.history = load_history(st.session_state.get('username', ''))
+    record_history(st.session_state.history, previous, df, changed_labels)
+    st.session_state.unified_columns = columns_with_data(df)
+    st.session_state.unified_task_index = build_task_index(df)
+    st.session_state.unified_search_index = build_search_index(df)
+
+def search_tasks(df: pd.DataFrame, search_index: pd.Series, search: str) -> pd.DataFrame:
+    """Return the tasks whose text contains the search term (case-insensitive)"""
+    if not search:
+        return df
+    matches = search_index.reindex(df.index).str.contains(search.lower(), regex=False, na=False)
+    return df[matches]
+
+def page_tasks(df: pd.DataFrame, sort_by: str, ascending: bool, page: int, page_size: int) -> pd.DataFrame:
+    """Sort tasks server-side and return only the rows of the requested page"""
+    if sort_by and sort_by in df.columns:
+        try:
+            df = df.sort_values(sort_by, ascending=ascending, na_position='last', kind='stable')
+        except TypeError:
+            # Mixed value types after edits, fall back to text ordering
+            df = df.sort_values(sort_by, ascending=ascending, na_position='last', kind='stable',
+                                key=lambda col: col.astype(str))
+    
+    start = page * page_size
+    return df.iloc[start:start + page_size]
+
+def coerce_edited_value(df: pd.DataFrame, col: str, value):
+    """Convert a value coming back from the task editor to the column's type"""
+    if col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col]):
+        return pd.to_datetime(value, errors='coerce')
+    return value
+
+def apply_editor_changes(editor_key: str, page_rows: List):
+    """Write edits from the paged task table back to the unified data by row label"""
+    changes = st.session_state.get(editor_key) or {}
+    df = st.session_state.unified_data.copy()
+    task_index = st.session_state.unified_task_index
+    
+    def resolve(position):
+        # Each page row is (Task ID, row label); the label is exact even when Task IDs repeat,
+        # and the Task ID index only confirms the task still exists
+        task_id, row_label = page_rows[position]
+        if row_label not in df.index or (task_id is not None and task_id not in task_index.index):
+            return None
+        return row_label
+    
+    changed_labels = []
+    for position, row_changes in changes.get('edited_rows', {}).items():
+        row_label = resolve(int(position))
+        if row_label is None:
+            continue
+        changed_labels.append(row_label)
+        for col, value in row_changes.items():
+            df.loc[row_label, col] = coerce_edited_value(df, col, value)
+    
+    deleted = [resolve(int(position)) for position in changes.get('deleted_rows', [])]
+    deleted = [row_label for row_label in deleted if row_label is not None]
+    if deleted:
+        df = df.drop(index=deleted)
+    
+    added = [row for row in changes.get('added_rows', []) if row]
+    if added:
+        added_df = pd.DataFrame(added)
+        for col in added_df.columns:
+            added_df[col] = coerce_edited_value(df, col, added_df[col])
+        # New tasks get the same defaults as create_unified_dataframe so filters and calibration see them
+        defaults = {col: value for col, value in UNIFIED_DEFAULTS.items() if col in df.columns}
+        added_df = added_df.reindex(columns=df.columns.union(added_df.columns, sort=False)).fillna(defaults)
+        start = df.index.max() + 1 if len(df) else 0
+        added_df.index = pd.RangeIndex(start, start + len(added_df))
+        changed_labels.extend(added_df.index)
+        df = pd.concat([df, added_df])
+    
+    set_unified_data(df, changed_labels)
+
+def iter_export_chunks(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Yield consecutive row slices of a dataframe"""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+def template_layout_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Arrange plan columns in the template sheet layout, taking the first source column with a real value.
+    
+    Placeholders filled in by UNIFIED_DEFAULTS (e.g. OWNER "Unassigned" on plan rows) only win when no
+    source has a real value.
+    """
+    layout = pd.DataFrame(index=df.index)
+    for position, (_, sources, _) in enumerate(TEMPLATE_LAYOUT):
+        values = pd.Series(None, index=df.index, dtype=object)
+        available = [col for col in sources if col in df.columns]
+        
+        # Placeholders are used as a last resort, then real values in priority order
+        for source in reversed(available):
+            values = df[source].where(~blank_mask(df[[source]])[source], values)
+        for source in reversed(available):
+            present = ~blank_mask(df[[source]])[source]
+            if isinstance(UNIFIED_DEFAULTS.get(source), str) and UNIFIED_DEFAULTS[source]:
+                present &= df[source].ne(UNIFIED_DEFAULTS[source])
+            values = df[source].where(present, values)
+        layout[position] = values
+    return layout.astype(object).where(layout.notna(), None)
+
+def arrow_schema(df: pd.DataFrame) -> pa.Schema:
+    """Fixed Parquet schema so every chunk is written with the same column types"""
+    fields = []
+    for col, dtype in df.dtypes.items():
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            arrow_type = pa.timestamp('ns')
+        elif pd.api.types.is_bool_dtype(dtype):
+            arrow_type = pa.bool_()
+        elif pd.api.types.is_numeric_dtype(dtype):
+            arrow_type = pa.from_numpy_dtype(dtype)
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(str(col), arrow_type))
+    return pa.schema(fields)
+
+def write_csv(df: pd.DataFrame, path: str):
+    """Stream a dataframe to CSV chunk by chunk"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        df.head(0).to_csv(f, index=False)
+        for chunk in iter_export_chunks(df):
+            chunk.to_csv(f, index=False, header=False)
+
+def write_parquet(df: pd.DataFrame, path: str):
+    """Stream a dataframe to Parquet, one row group per chunk"""
+    schema = arrow_schema(df)
+    text_columns = [field.name for field in schema if field.type == pa.string()]
+    
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in iter_export_chunks(df.rename(columns=str)):
+            chunk = chunk.copy()
+            for col in text_columns:
+                chunk[col] = chunk[col].astype(str).where(chunk[col].notna(), None)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+def write_xlsx(df: pd.DataFrame, path: str):
+    """Stream a dataframe to xlsx in the template sheet layout using openpyxl write-only mode"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=TEMPLATE_SHEET_NAME)
+    
+    for position, (_, _, width) in enumerate(TEMPLATE_LAYOUT, start=1):
+        ws.column_dimensions[get_column_letter(position)].width = width
+    
+    # Title on row 1 and headers on row 3, as in the template
+    ws.append([None, None, None, "Task "])
+    ws.append([])
+    ws.append([header or None for header, _, _ in TEMPLATE_LAYOUT])
+    
+    for chunk in iter_export_chunks(df):
+        for row in template_layout_frame(chunk).itertuples(index=False, name=None):
+            ws.append(row)
+    
+    wb.save(path)
+
+EXPORT_WRITERS = {"csv": write_csv, "parquet": write_parquet, "xlsx": write_xlsx}
+
+def export_file_path(name: str, extension: str, export_dir: str, used_paths: set) -> str:
+    """File path for an exported plan, made unique within a batch"""
+    safe_name = re.sub(r'[^\w\-]+', '_', name).strip('_') or "plan"
+    path = os.path.join(export_dir, f"{safe_name}.{extension}")
+    suffix = 2
+    while path in used_paths:
+        path = os.path.join(export_dir, f"{safe_name}_{suffix}.{extension}")
+        suffix += 1
+    used_paths.add(path)
+    return path
+
+def export_plan(df: pd.DataFrame, name: str, path: str) -> Dict[str, any]:
+    """Export one plan to a file and report its throughput"""
+    extension = os.path.splitext(path)[1].lstrip('.')
+    
+    started = time.perf_counter()
+    EXPORT_WRITERS[extension](df, path)
+    seconds = time.perf_counter() - started
+    
+    return {
+        'name': name,
+        'path': path,
+        'rows': len(df),
+        'seconds': seconds,
+        'rows_per_sec': len(df) / seconds if seconds > 0 else 0.0
+    }
+
+def export_plans(plans: List, extension: str, export_dir: str = EXPORT_DIR) -> List[Dict[str, any]]:
+    """Export several (name, dataframe) plans one at a time, each to its own file"""
+    os.makedirs(export_dir, exist_ok=True)
+    used_paths = set()
+    results = []
+    for name, df in plans:
+        try:
+            results.append(export_plan(df, name, export_file_path(name, extension, export_dir, used_paths)))
+        except Exception as e:
+            st.error(f"Error exporting '{name}': {str(e)}")
+    return results
 
 def main_app():
     """Main application after login"""
@@ -608,13 +1639,30 @@ def main_app():
     if 'projects' not in st.session_state:
         st.session_state.projects = load_projects()
     
+    if 'baselines' not in st.session_state:
+        st.session_state.baselines = load_baselines()
+    
+    # Plan versions from earlier sessions are available for time travel
+    if 'history' not in st.session_state:
+        st.session_state.history = load_history(st.session_state.get('username', ''))
+    
     # Load template and demo data
     template_df = load_template()
     demo_df = load_demo_data()
     
+    # Duration calibration from completed tasks across all projects; only projects not yet observed are read
+    if 'calibration' not in st.session_state:
+        st.session_state.calibration = load_calibration() or new_calibration()
+        if observe_projects(st.session_state.calibration, st.session_state.projects):
+            save_calibration(st.session_state.calibration)
+    
     # Create unified dataframe
     if 'unified_data' not in st.session_state:
-        st.session_state.unified_data = create_unified_dataframe(template_df, demo_df)
+        set_unified_data(create_unified_dataframe(template_df, demo_df))
+    
+    # The template only changes on restart, so its columns with data are computed once
+    if 'template_columns' not in st.session_state:
+        st.session_state.template_columns = columns_with_data(template_df)
     
     # Sidebar controls
     st.sidebar.header("🎛️ Controls")
@@ -671,6 +1719,42 @@ def main_app():
     
     st.sidebar.markdown("---")
     
+    # Baselines for schedule variance
+    st.sidebar.header("📐 Baselines")
+    
+    new_baseline_name = st.sidebar.text_input("Baseline Name", key="new_baseline_name")
+    if st.sidebar.button("💾 Save Baseline", key="save_baseline_btn"):
+        if new_baseline_name.strip():
+            success, message = save_baseline(new_baseline_name.strip(), st.session_state.unified_data)
+            if success:
+                st.sidebar.success(message)
+            else:
+                st.sidebar.error(message)
+        else:
+            st.sidebar.error("Please enter a baseline name")
+    
+    if st.session_state.baselines:
+        selected_baseline = st.sidebar.selectbox(
+            "Compare Against",
+            ["None"] + list(st.session_state.baselines.keys()),
+            key="selected_baseline"
+        )
+        if selected_baseline != "None":
+            saved = st.session_state.baselines[selected_baseline]
+            st.sidebar.caption(f"Saved {saved['saved_at']} by {saved['saved_by'] or 'unknown'}")
+            if st.sidebar.button("🗑️ Delete Baseline", key="delete_baseline_btn"):
+                success, message = delete_baseline(selected_baseline)
+                if success:
+                    st.sidebar.success(message)
+                    st.rerun()
+                else:
+                    st.sidebar.error(message)
+    else:
+        selected_baseline = "None"
+        st.sidebar.info("No baselines saved yet")
+    
+    st.sidebar.markdown("---")
+    
     # Filters for unified view
     st.sidebar.header("🔍 Filters")
     
@@ -693,6 +1777,40 @@ def main_app():
     else:
         status_filter = "All Statuses"
     
+    st.sidebar.markdown("---")
+    
+    # Duration estimates for Testing & Model Training tasks
+    st.sidebar.header("📏 Estimates")
+    st.sidebar.checkbox(
+        "Use calibrated estimates", value=True, key="use_calibrated_estimates",
+        help="Use median actual durations of completed tasks instead of the static Simple/Medium/Complex hours"
+    )
+    st.sidebar.caption(", ".join(f"{complexity}: {hours}h" for complexity, hours in get_complexity_hours().items()))
+    if st.sidebar.button("🔁 Reschedule with Estimates", key="reschedule_btn"):
+        set_unified_data(apply_dependency_chaining(st.session_state.unified_data,
+                                                   st.session_state.unified_task_index))
+        st.rerun()
+    
+    st.sidebar.markdown("---")
+    
+    # Time travel over the recorded plan versions
+    st.sidebar.header("🕰️ Time Travel")
+    historical_data = None
+    if st.sidebar.checkbox("View plan as of a past time", key="time_travel"):
+        first_recorded = st.session_state.history['times'][0] if st.session_state.history['times'] else datetime.now()
+        as_of_date = st.sidebar.date_input("Date", value=datetime.now().date(),
+                                           min_value=first_recorded.date(), key="as_of_date")
+        as_of_time = st.sidebar.time_input("Time", value=datetime.min.time().replace(hour=23, minute=59),
+                                           key="as_of_time")
+        as_of = datetime.combine(as_of_date, as_of_time).replace(second=59, microsecond=999999)
+        
+        historical_data, historical_version = get_plan_at(as_of)
+        if historical_data is None:
+            st.sidebar.warning(f"No plan recorded before {first_recorded:%Y-%m-%d %H:%M}")
+        else:
+            st.sidebar.caption(f"Showing version {historical_version} of {len(st.session_state.history['entries'])} "
+                               f"in statistics and the Gantt chart")
+    
     # Apply filters to unified data
     filtered_unified_data = st.session_state.unified_data.copy()
     
@@ -705,6 +1823,17 @@ def main_app():
     if status_filter and status_filter != "All Statuses" and 'Status' in filtered_unified_data.columns:
         filtered_unified_data = filtered_unified_data[filtered_unified_data['Status'] == status_filter]
     
+    # Statistics and the Gantt chart show the historical plan when time travel is on
+    if historical_data is not None:
+        panel_data = apply_filters(
+            historical_data,
+            site_filter if 'Site' in historical_data.columns else None,
+            phase_filter if 'Phase' in historical_data.columns else None,
+            status_filter if 'Status' in historical_data.columns else None
+        )
+    else:
+        panel_data = filtered_unified_data
+    
     # Main content area
     st.header("📋 Template Preview & Project Tasks")
     st.markdown("**Combined view showing your Excel template data and project tasks together**")
@@ -714,13 +1843,19 @@ def main_app():
     st.markdown("This is the base template loaded from your Excel file:")
     
     # Show only columns that have data
-    template_columns_with_data = []
-    for col in template_df.columns:
-        if template_df[col].str.strip().ne('').any():
-            template_columns_with_data.append(col)
+    template_columns_with_data = st.session_state.template_columns
     
     if template_columns_with_data:
-        st.dataframe(template_df[template_columns_with_data], use_container_width=True)
+        template_page_size = st.selectbox("Rows per page", PAGE_SIZES, key="template_page_size")
+        template_pages = max(1, int(np.ceil(len(template_df) / template_page_size)))
+        template_page = st.number_input("Page", min_value=1, max_value=template_pages, value=1,
+                                        key="template_page") - 1
+        template_start = template_page * template_page_size
+        st.dataframe(
+            template_df[template_columns_with_data].iloc[template_start:template_start + template_page_size],
+            use_container_width=True
+        )
+        st.caption(f"Page {template_page + 1} of {template_pages} ({len(template_df)} rows)")
     else:
         st.info("No template data found")
     
@@ -730,61 +1865,221 @@ def main_app():
     st.subheader("📊 Project Tasks (Combined Data)")
     st.markdown("**Note:** Only columns with actual data are displayed")
     
-    # Get columns that have actual data in unified dataframe
-    columns_with_data = []
-    for col in filtered_unified_data.columns:
-        if filtered_unified_data[col].notna().any() and filtered_unified_data[col].astype(str).str.strip().ne('').any():
-            columns_with_data.append(col)
-    
-    if columns_with_data:
-        # Create editable dataframe with only columns that have data
-        edited_df = st.data_editor(
-            filtered_unified_data[columns_with_data],
+    # Columns with data are cached per version of the unified dataframe
+    unified_columns = st.session_state.unified_columns
+    
+    if unified_columns:
+        # Search, sort and pagination run server-side so only the visible page is sent to the browser
+        search_col, sort_col, order_col, size_col = st.columns([3, 2, 1, 1])
+        with search_col:
+            search = st.text_input("🔎 Search tasks", key="task_search").strip()
+        with sort_col:
+            sort_by = st.selectbox("Sort by", ["(none)"] + unified_columns, key="task_sort")
+        with order_col:
+            ascending = st.radio("Order", ["Asc", "Desc"], key="task_order") == "Asc"
+        with size_col:
+            page_size = st.selectbox("Rows per page", PAGE_SIZES, key="task_page_size")
+        
+        matching_tasks = search_tasks(filtered_unified_data, st.session_state.unified_search_index, search)
+        total_matches = len(matching_tasks)
+        total_pages = max(1, int(np.ceil(total_matches / page_size)))
+        page = min(st.number_input("Page", min_value=1, value=1, key="task_page"), total_pages) - 1
+        
+        page_df = page_tasks(
+            matching_tasks, None if sort_by == "(none)" else sort_by, ascending, page, page_size
+        )[unified_columns]
+        
+        # Remember which row and task each visible row is so edits are written back to that row
+        page_task_ids = page_df['Task ID'] if 'Task ID' in page_df.columns else pd.Series(None, index=page_df.index)
+        page_rows = [
+            (None if pd.isna(task_id) or not str(task_id).strip() else str(task_id), row_label)
+            for task_id, row_label in zip(page_task_ids, page_df.index)
+        ]
+        
+        # The editor key follows the data version so a fresh editor is shown after each write-back
+        editor_key = f"unified_editor_{st.session_state.unified_version}_{page}_{page_size}"
+        st.data_editor(
+            page_df,
             num_rows="dynamic",
             use_container_width=True,
-            key="unified_editor"
+            key=editor_key,
+            on_change=apply_editor_changes,
+            args=(editor_key, page_rows)
         )
         
-        # Update unified data if changes detected
-        if not edited_df.equals(filtered_unified_data[columns_with_data]):
-            st.session_state.unified_data = edited_df
-            st.info("💡 Changes detected! Data updated in session.")
+        first_row = page * page_size + 1 if total_matches else 0
+        last_row = min((page + 1) * page_size, total_matches)
+        st.caption(f"Showing rows {first_row}-{last_row} of {total_matches} (page {page + 1} of {total_pages})")
     else:
         st.info("No project data found")
     
     # Project statistics
     st.markdown("---")
     st.subheader("📈 Project Statistics")
+    if historical_data is not None:
+        st.caption(f"🕰️ Plan version {historical_version} as of {as_of:%Y-%m-%d %H:%M}")
     
-    if not filtered_unified_data.empty:
+    if not panel_data.empty:
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            total_tasks = len(filtered_unified_data)
+            total_tasks = len(panel_data)
             st.metric("Total Tasks", total_tasks)
         
         with col2:
-            if 'Owner' in filtered_unified_data.columns:
-                unique_owners = filtered_unified_data['Owner'].nunique()
+            if 'Owner' in panel_data.columns:
+                unique_owners = panel_data['Owner'].nunique()
                 st.metric("Unique Owners", unique_owners)
             else:
                 st.metric("Unique Owners", 0)
         
         with col3:
-            if 'Phase' in filtered_unified_data.columns:
-                active_phases = filtered_unified_data['Phase'].nunique()
+            if 'Phase' in panel_data.columns:
+                active_phases = panel_data['Phase'].nunique()
                 st.metric("Active Phases", active_phases)
             else:
                 st.metric("Active Phases", 0)
         
         with col4:
-            if 'Status' in filtered_unified_data.columns:
-                completed_tasks = len(filtered_unified_data[filtered_unified_data['Status'] == 'Completed'])
+            if 'Status' in panel_data.columns:
+                completed_tasks = len(panel_data[panel_data['Status'] == 'Completed'])
                 completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
                 st.metric("Completion Rate", f"{completion_rate:.1f}%")
             else:
                 st.metric("Completion Rate", "N/A")
     
+    # Duration calibration from actuals
+    with st.expander("📏 Duration Calibration (from completed tasks)"):
+        calibration = st.session_state.calibration
+        if calibration['groups']:
+            st.dataframe(pd.DataFrame([
+                {"Complexity": complexity, "Static Hours": COMPLEXITY_HOURS[complexity],
+                 "Calibrated Hours": calibration['complexity_hours'][complexity]}
+                for complexity in COMPLEXITY_HOURS
+            ]), use_container_width=True)
+            st.dataframe(calibration_table(calibration), use_container_width=True)
+            st.caption(f"{len(calibration['recorded'])} completed tasks recorded; groups need "
+                       f"{CALIBRATION_MIN_SAMPLES} samples before their median replaces the static hours.")
+        else:
+            st.info("No completed tasks with actual start and finish dates yet")
+    
+    # Schedule variance against the selected baseline
+    baseline_df = None
+    if selected_baseline != "None":
+        st.markdown("---")
+        st.subheader(f"📐 Schedule Variance vs. '{selected_baseline}'")
+        
+        baseline_df = st.session_state.baselines[selected_baseline]['data']
+        variance, variance_summary = get_baseline_variance(selected_baseline)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Tasks Moved", variance_summary['tasks_moved'],
+                      help=f"{variance_summary['tasks_compared']} tasks compared")
+        with col2:
+            st.metric("Avg Finish Variance", f"{variance_summary['avg_finish_variance']:+.1f} days")
+        with col3:
+            st.metric("Max Finish Variance", f"{variance_summary['max_finish_variance']:+.0f} days")
+        with col4:
+            st.metric("Avg Actual Slip", f"{variance_summary['avg_actual_slip']:+.1f} days")
+        
+        if variance_summary['tasks_added'] or variance_summary['tasks_removed']:
+            st.caption(f"{variance_summary['tasks_added']} tasks added and "
+                       f"{variance_summary['tasks_removed']} removed since the baseline")
+        
+        st.markdown("**Variance by Phase**")
+        st.dataframe(variance_summary['phase_variance'], use_container_width=True)
+        
+        # Only the largest slips are sent to the browser
+        moved_tasks = variance[variance['Change'] == 'Moved']
+        if not moved_tasks.empty:
+            st.markdown("**Most Rescheduled Tasks**")
+            largest_slips = moved_tasks['Finish Variance Days'].abs().nlargest(PAGE_SIZES[0]).index
+            st.dataframe(moved_tasks.loc[largest_slips], use_container_width=True)
+    
+    # What-if scenarios on top of the current plan
+    st.markdown("---")
+    st.subheader("🧪 What-if Scenarios")
+    st.markdown("Scenarios store only the changed tasks and reschedule their dependents, the real plan is untouched.")
+    
+    if 'scenarios' not in st.session_state:
+        st.session_state.scenarios = {}
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        new_scenario_name = st.text_input("Scenario Name", key="new_scenario_name")
+    with col2:
+        if st.button("➕ Create Scenario", key="create_scenario_btn"):
+            if new_scenario_name.strip():
+                success, message = create_scenario(new_scenario_name.strip())
+                if success:
+                    st.success(message)
+                else:
+                    st.error(message)
+            else:
+                st.error("Please enter a scenario name")
+    
+    task_ids = list(st.session_state.unified_task_index.index)
+    if st.session_state.scenarios and task_ids:
+        selected_scenario = st.selectbox("Edit Scenario", list(st.session_state.scenarios.keys()),
+                                         key="selected_scenario")
+        scenario = st.session_state.scenarios[selected_scenario]
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            override_task = st.selectbox("Task", task_ids, key="override_task")
+        with col2:
+            override_type = st.selectbox("Change", ["Complexity", "Slip (days)"], key="override_type")
+        with col3:
+            if override_type == "Complexity":
+                override_value = st.selectbox("Complexity", list(COMPLEXITY_HOURS.keys()), key="override_complexity")
+            else:
+                override_value = st.number_input("Days", value=14, step=1, key="override_slip_days")
+        with col4:
+            if st.button("✅ Apply Override", key="apply_override_btn"):
+                if override_type == "Complexity":
+                    fields = {'Complexity': override_value}
+                else:
+                    fields = slip_override(override_task, scenario, override_value)
+                set_scenario_override(selected_scenario, override_task, fields)
+        
+        if scenario["overrides"]:
+            st.dataframe(
+                pd.DataFrame.from_dict(scenario["overrides"], orient='index').rename_axis('Task ID'),
+                use_container_width=True
+            )
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("🧹 Clear Overrides", key="clear_overrides_btn"):
+                scenario["overrides"] = {}
+                scenario["revision"] += 1
+                st.rerun()
+        with col2:
+            if st.button("🗑️ Delete Scenario", key="delete_scenario_btn"):
+                success, message = delete_scenario(selected_scenario)
+                if success:
+                    st.rerun()
+                else:
+                    st.error(message)
+        
+        # Side-by-side comparison of all scenarios
+        scenarios_summary = []
+        for name, scenario in st.session_state.scenarios.items():
+            _, summary = get_scenario_result(name)
+            scenarios_summary.append({
+                "Scenario": name,
+                "Overridden Tasks": len(scenario["overrides"]),
+                "Tasks Rescheduled": summary['tasks_rescheduled'],
+                "Project Finish": summary['project_finish'],
+                "Finish Shift (days)": summary['project_shift_days'],
+                "Effort Hours Change": summary['effort_hours_change']
+            })
+        st.markdown("**Scenario Comparison**")
+        st.dataframe(pd.DataFrame(scenarios_summary), use_container_width=True)
+    elif st.session_state.scenarios:
+        st.info("Scenarios need tasks with a Task ID")
+    
     # Show all projects summary
     if st.session_state.projects:
         st.markdown("---")
@@ -808,7 +2103,21 @@ def main_app():
     
     # Check if we have the necessary columns for Gantt chart
     if 'Planned Start' in filtered_unified_data.columns and 'Planned Finish' in filtered_unified_data.columns:
-        gantt_fig = generate_gantt(filtered_unified_data)
+        gantt_plans = ["Current Plan"] + list(st.session_state.scenarios.keys())
+        gantt_plan = st.selectbox("Plan", gantt_plans, key="gantt_plan")
+        
+        if gantt_plan == "Current Plan":
+            gantt_source = panel_data
+        else:
+            scenario_rows, _ = get_scenario_result(gantt_plan)
+            gantt_source = apply_filters(
+                materialize_scenario(st.session_state.unified_data, st.session_state.unified_task_index, scenario_rows),
+                site_filter if 'Site' in filtered_unified_data.columns else None,
+                phase_filter if 'Phase' in filtered_unified_data.columns else None,
+                status_filter if 'Status' in filtered_unified_data.columns else None
+            )
+        
+        gantt_fig = generate_gantt(gantt_source, baseline_df)
         if gantt_fig:
             st.plotly_chart(gantt_fig, use_container_width=True)
         else:
@@ -816,10 +2125,69 @@ def main_app():
     else:
         st.info("📅 Gantt chart requires 'Planned Start' and 'Planned Finish' columns. Add date information to see the timeline visualization.")
     
+    # Export
+    st.markdown("---")
+    st.subheader("📤 Export Plans")
+    
+    # Sources are (kind, project name) so a project called "Unified Plan" stays distinct
+    export_sources = [("plan", None)] + [("project", name) for name in st.session_state.projects.keys()]
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        selected_exports = st.multiselect(
+            "Plans to Export", export_sources, default=[("plan", None)], key="export_sources",
+            format_func=lambda source: "Unified Plan" if source[0] == "plan" else f"Project: {source[1]}"
+        )
+    with col2:
+        export_format = st.selectbox("Format", list(EXPORT_FORMATS.keys()), key="export_format")
+    
+    if st.button("📤 Export", key="export_btn"):
+        if selected_exports:
+            plans = [
+                ("Unified Plan", st.session_state.unified_data) if kind == "plan"
+                else (name, st.session_state.projects[name])
+                for kind, name in selected_exports
+            ]
+            with st.spinner("Exporting..."):
+                st.session_state.export_results = export_plans(plans, EXPORT_FORMATS[export_format])
+        else:
+            st.error("Please select at least one plan to export")
+    
+    if st.session_state.get('export_results'):
+        results = st.session_state.export_results
+        total_rows = sum(result['rows'] for result in results)
+        total_seconds = sum(result['seconds'] for result in results)
+        st.success(f"Exported {total_rows} rows to {len(results)} file(s) at "
+                   f"{total_rows / total_seconds if total_seconds > 0 else 0:,.0f} rows/sec")
+        
+        st.dataframe(pd.DataFrame([{
+            "Plan": result['name'],
+            "File": result['path'],
+            "Rows": result['rows'],
+            "Seconds": round(result['seconds'], 3),
+            "Rows/sec": round(result['rows_per_sec'])
+        } for result in results]), use_container_width=True)
+        
+        # Files are read back only for the one download the user asks for
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            download_path = st.selectbox("File to Download", [result['path'] for result in results],
+                                         key="download_path")
+        with col2:
+            prepare_download = st.button("📦 Prepare Download", key="prepare_download_btn")
+        
+        if prepare_download:
+            if os.path.exists(download_path):
+                with open(download_path, 'rb') as f:
+                    st.download_button(f"⬇️ {os.path.basename(download_path)}", f,
+                                       file_name=os.path.basename(download_path),
+                                       key="download_btn")
+            else:
+                st.error(f"File '{download_path}' no longer exists")
+    
     # Reset button
     st.markdown("---")
     if st.button("🔄 Reset to Original Data", type="primary"):
-        st.session_state.unified_data = create_unified_dataframe(template_df, demo_df)
+        set_unified_data(create_unified_dataframe(template_df, demo_df))
         st.rerun()
 
 def main():
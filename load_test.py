@@ -0,0 +1,61 @@
+"""Load test for the plan API.
+
+Start the server first (python api_server.py), then run:
+
+    python load_test.py --requests 2000 --concurrency 16
+
+Reports requests/sec per endpoint, with and without ETag revalidation.
+"""
+import argparse
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ENDPOINTS = [
+    "/api/projects",
+    "/api/tasks?page=1&page_size=50",
+    "/api/tasks?search=testing&sort=Planned%20Start&page=1&page_size=50",
+    "/api/kpis",
+    "/api/gantt",
+    "/api/critical-path"
+]
+
+def fetch(url, etag=None):
+    """Issue one GET and return (status, etag)"""
+    request = urllib.request.Request(url, headers={'Accept-Encoding': 'gzip'})
+    if etag:
+        request.add_header('If-None-Match', etag)
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            return response.status, response.headers.get('ETag')
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get('ETag')
+
+def run(url, total_requests, concurrency, revalidate):
+    """Hit one URL repeatedly and return (requests/sec, error count)"""
+    etag = fetch(url)[1] if revalidate else None
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        statuses = list(pool.map(lambda _: fetch(url, etag)[0], range(total_requests)))
+    seconds = time.perf_counter() - started
+    errors = sum(1 for status in statuses if status not in (200, 304))
+    return total_requests / seconds, errors
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure requests/sec against a local plan API")
+    parser.add_argument('--base-url', default='http://127.0.0.1:8502')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'Endpoint':<70} {'200 req/s':>10} {'304 req/s':>10} {'errors':>7}")
+    for endpoint in ENDPOINTS:
+        url = args.base_url.rstrip('/') + endpoint
+        full_rate, full_errors = run(url, args.requests, args.concurrency, revalidate=False)
+        cached_rate, cached_errors = run(url, args.requests, args.concurrency, revalidate=True)
+        print(f"{endpoint:<70} {full_rate:>10.0f} {cached_rate:>10.0f} {full_errors + cached_errors:>7}")
+
+if __name__ == "__main__":
+    main()